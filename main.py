@@ -1,8 +1,28 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import base64
+import html
 import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib decoder/encoder
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # fall back to decoding whole responses
+    ijson = None
 
 # Configure Streamlit page
 st.set_page_config(
@@ -21,96 +41,215 @@ if 'messages' not in st.session_state:
     st.session_state.messages = []
 if 'apps' not in st.session_state:
     st.session_state.apps = []
+if 'artifacts' not in st.session_state:
+    st.session_state.artifacts = []
+
+# (connect, read) timeouts so a slow backend can't stall the rerun loop
+REQUEST_TIMEOUT = (3, 30)
+
+# Coalesce streamed text into at most ~4 UI updates per second
+STREAM_FLUSH_INTERVAL_NS = 250_000_000
+
+# Gaps between SSE events longer than this are reported as stalls in Debug Mode
+SSE_STALL_MS = 1000
+
+# Request invariants, built once instead of per call
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+_SEND_TEMPLATE = {'streaming': True, 'new_message': {'role': 'user'}}
+
+def _session() -> requests.Session:
+    """Get the pooled HTTP session, creating it on first use"""
+    if '_http' not in st.session_state:
+        http = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retries)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+        st.session_state['_http'] = http
+    return st.session_state['_http']
+
+def _json_loads(data):
+    """Decode JSON from str or bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_pretty(obj: Any) -> str:
+    """Pretty-print an object as 2-space indented JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+@st.cache_resource
+def _pool() -> ThreadPoolExecutor:
+    """Shared worker pool for independent API calls (stays below the HTTP pool size)"""
+    return ThreadPoolExecutor(max_workers=4)
+
+def _submit(fn, *args, **kwargs) -> Future:
+    """Run fn on the worker pool with this script run's context, so st.* calls work there"""
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+
+    return _pool().submit(run)
 
 def make_api_request(endpoint: str, method: str = "GET", data: Dict = None, stream: bool = False) -> Optional[Dict]:
     """Make API request with error handling and streaming support"""
     try:
         url = f"{API_BASE_URL}{endpoint}"
-        headers = {'Content-Type': 'application/json'}
         
         if method == "POST":
             if stream:
                 url = f"{API_BASE_URL}/run_sse"
-            response = requests.post(url, json=data, headers=headers, stream=stream)
+            response = _session().post(url, json=data, headers=_JSON_HEADERS, stream=stream, timeout=REQUEST_TIMEOUT)
         else:
-            response = requests.request(method, url, headers=headers)
+            response = _session().request(method, url, headers=_JSON_HEADERS, stream=stream, timeout=REQUEST_TIMEOUT)
         
         response.raise_for_status()
         
         if stream:
             return response
-        return response.json() if response.content else {}
-    except requests.exceptions.RequestException as e:
+        return _json_loads(response.content) if response.content else {}
+    except (requests.exceptions.RequestException, ValueError) as e:
         st.error(f"API Error: {str(e)}")
         return None
 
-def process_sse_events(response):
-    """Process Server-Sent Events from response"""
-    formatted_events = []
+def iter_sse_events(response, started: Optional[float] = None) -> Iterator[Dict]:
+    """Yield formatted events from a Server-Sent Events response as they complete"""
     current_event = None
+    # Whether current_event was built from partial deltas already shown to the user
+    streamed = False
+    # Arrival time of each yielded event, starting with `started` (when the request
+    # was sent) or else the first read; only recorded in Debug Mode
+    timings = None
+    if st.session_state.get('debug_mode'):
+        timings = st.session_state._sse_timings = [started or time.perf_counter()]
     
     try:
-        for line in response.iter_lines():
-            if line:
-                line = line.decode('utf-8')
-                if line.startswith('data: '):
-                    try:
-                        event_data = json.loads(line[6:])
-                        if event_data.get('content', {}).get('parts'):
-                            for part in event_data['content']['parts']:
-                                if part.get('functionCall'):
-                                    current_event = {
-                                        'type': 'function_call',
-                                        'content': part['functionCall'],
-                                        'role': 'assistant',
-                                        'name': part['functionCall'].get('name'),
-                                        'args': part['functionCall'].get('args')
-                                    }
-                                elif part.get('functionResponse'):
-                                    response_data = part['functionResponse']
-                                    if response_data.get('name') == 'search_youtube_videos':
-                                        videos = response_data.get('response', {}).get('videos', [])
-                                        current_event = {
-                                            'type': 'video_list',
-                                            'content': videos,
-                                            'role': 'assistant'
-                                        }
-                                elif part.get('text'):
-                                    if current_event and current_event.get('type') == 'text':
-                                        current_event['content'] += part['text']
-                                    else:
-                                        current_event = {
-                                            'type': 'text',
-                                            'content': part['text'],
-                                            'role': 'assistant'
-                                        }
-                            
-                            if not event_data.get('partial') and current_event:
-                                formatted_events.append(current_event)
-                                current_event = None
-                                
-                    except json.JSONDecodeError:
-                        continue
+        # Work on raw bytes: both decoders accept them directly, so no per-line decode
+        for line in response.iter_lines(decode_unicode=False, chunk_size=8192):
+            if not line or not line.startswith(b'data: '):
+                continue
+            # Skip heartbeats, empty frames and the [DONE] sentinel without going
+            # through the decoder; anything else that fails to parse is a real error
+            payload = line[6:].strip()
+            if payload in (b'', b'[DONE]') or payload[0] not in (0x7B, 0x5B):
+                continue
+            event_data = _json_loads(payload)
+            if not isinstance(event_data, dict):
+                continue
+            content = event_data.get('content')
+            parts = content and content.get('parts')
+            if parts:
+                partial = event_data.get('partial')
+                for part in parts:
+                    if fc := part.get('functionCall'):
+                        if streamed:
+                            # Complete the text that was streamed so far before replacing it
+                            yield current_event
+                            streamed = False
+                        current_event = {
+                            'type': 'function_call',
+                            'content': fc,
+                            'role': 'assistant',
+                            'name': fc.get('name'),
+                            'args': fc.get('args')
+                        }
+                    elif fr := part.get('functionResponse'):
+                        if fr.get('name') == 'search_youtube_videos':
+                            videos = fr.get('response', {}).get('videos', [])
+                            if streamed:
+                                yield current_event
+                                streamed = False
+                            current_event = {
+                                'type': 'video_list',
+                                'content': videos,
+                                'role': 'assistant'
+                            }
+                    elif tx := part.get('text'):
+                        if streamed and not partial:
+                            # The final frame repeats the full text of the deltas, so replace
+                            current_event['content'] = tx
+                            streamed = False
+                        elif current_event and current_event.get('type') == 'text':
+                            current_event['content'] += tx
+                        else:
+                            current_event = {
+                                'type': 'text',
+                                'content': tx,
+                                'role': 'assistant'
+                            }
+                        if partial:
+                            streamed = True
+                            # Surface the delta so the UI can show it before the event completes
+                            if timings is not None:
+                                timings.append(time.perf_counter())
+                            yield {
+                                'type': 'text',
+                                'content': tx,
+                                'role': 'assistant',
+                                'partial': True
+                            }
+                
+                if not partial and current_event:
+                    if timings is not None:
+                        timings.append(time.perf_counter())
+                    yield current_event
+                    current_event = None
+                    streamed = False
     except Exception as e:
-        st.error(f"Error processing SSE events: {str(e)}")
-    
-    return formatted_events
+        st.error(f"Error processing SSE events, the rest of the reply was dropped: {str(e)}")
+    finally:
+        # Return the connection to the pool even when the stream is aborted
+        response.close()
+
+    # The stream ended (or failed) before the final text frame: keep what was shown
+    if streamed:
+        yield current_event
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_apps(base_url: str) -> List[str]:
+    """Fetch the app list (cached, raises on failure so errors aren't cached)"""
+    response = _session().get(f"{base_url}/list-apps", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_sessions(base_url: str, app_name: str, user_id: str) -> List[Dict]:
+    """Fetch the session list (cached, raises on failure so errors aren't cached)"""
+    response = _session().get(f"{base_url}/apps/{app_name}/users/{user_id}/sessions", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return _json_loads(response.content) if response.content else []
 
 def load_apps():
     """Load available apps"""
-    apps = make_api_request("/list-apps")
+    try:
+        apps = _fetch_apps(API_BASE_URL)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        st.error(f"API Error: {str(e)}")
+        return []
     if apps:
         st.session_state.apps = apps
         return apps
     return []
 
+def _set_current_session(session: Dict):
+    """Make `session` current, formatting its header timestamp once up front"""
+    last_update = datetime.fromtimestamp(session.get('last_update_time', 0))
+    session['_last_update_str'] = last_update.strftime('%Y-%m-%d %H:%M')
+    st.session_state.current_session = session
+
 def create_session(app_name: str, user_id: str, initial_state: Dict = None):
     """Create a new session"""
     data = initial_state or {}
     session = make_api_request(f"/apps/{app_name}/users/{user_id}/sessions", "POST", data)
     if session:
-        st.session_state.current_session = session
+        _fetch_sessions.clear()
+        _set_current_session(session)
         st.session_state.messages = []
+        st.session_state.artifacts = []
         return session
     return None
 
@@ -127,57 +266,110 @@ def format_video_response(video: Dict) -> Dict:
         "publishedAt": video.get('publishedAt')
     }
 
-def send_message(app_name: str, user_id: str, session_id: str, message: str):
+def send_message(app_name: str, user_id: str, session_id: str, message: str) -> Iterator[Dict]:
     """Send a message to the agent and format video responses"""
-    data = {
-        "app_name": app_name,
-        "user_id": user_id,
-        "session_id": session_id,
-        "new_message": {
-            "parts": [{"text": message}],
-            "role": "user"
-        },
-        "streaming": True
-    }
+    data = _SEND_TEMPLATE | {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+    data["new_message"] = {"parts": [{"text": message}], "role": "user"}
     
+    started = time.perf_counter()
     response = make_api_request("/run", "POST", data, stream=True)
     if response:
-        return process_sse_events(response)
-    return []
+        return iter_sse_events(response, started)
+    return iter(())
 
 def list_sessions(app_name: str, user_id: str):
     """List sessions for a user"""
-    sessions = make_api_request(f"/apps/{app_name}/users/{user_id}/sessions")
+    try:
+        sessions = _fetch_sessions(API_BASE_URL, app_name, user_id)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        st.error(f"API Error: {str(e)}")
+        return []
     return sessions or []
 
-def load_session(app_name: str, user_id: str, session_id: str):
-    """Load a specific session"""
-    session = make_api_request(f"/apps/{app_name}/users/{user_id}/sessions/{session_id}")
-    if session:
-        st.session_state.current_session = session
-        messages = []
-        for event in session.get('events', []):
-            if event.get('content') and event.get('content', {}).get('parts'):
-                for part in event['content']['parts']:
-                    if part.get('function_response'):
-                        response = part['function_response'].get('response', {})
-                        if response.get('videos'):
-                            messages.append({
-                                'type': 'video_list',
-                                'content': response['videos'],
-                                'role': event.get('author', 'assistant'),
-                                'timestamp': event.get('timestamp', 0)
-                            })
-                    elif part.get('text'):
+def _iter_session_events(response, session: Dict) -> Iterator[Dict]:
+    """Yield session events one at a time, filling `session` with the other top-level fields"""
+    if ijson is None:
+        session.update(_json_loads(response.content) if response.content else {})
+        yield from session.pop('events', None) or []
+        return
+
+    response.raw.decode_content = True
+    session_builder = ijson.ObjectBuilder()
+    event_builder = None
+    for prefix, kind, value in ijson.parse(response.raw, use_float=True):
+        if prefix == 'events.item' and kind == 'start_map':
+            event_builder = ijson.ObjectBuilder()
+        if event_builder is not None:
+            event_builder.event(kind, value)
+            if prefix == 'events.item' and kind == 'end_map':
+                yield event_builder.value
+                event_builder = None
+            continue
+        session_builder.event(kind, value)
+    session.update(session_builder.value or {})
+    session.pop('events', None)
+
+def _read_session(endpoint: str) -> Optional[Tuple[Dict, List[Dict]]]:
+    """Fetch a session and build its chat messages, parsing events incrementally"""
+    response = make_api_request(endpoint, stream=True)
+    if not response:
+        return None
+
+    session = {}
+    messages = []
+    try:
+        for event in _iter_session_events(response, session):
+            content = event.get('content')
+            parts = content and content.get('parts')
+            if not parts:
+                continue
+            for part in parts:
+                if fr := part.get('function_response'):
+                    videos = fr.get('response', {}).get('videos')
+                    if videos:
                         messages.append({
-                            'type': 'text',
-                            'content': part['text'],
-                            'role': event.get('author', 'unknown'),
-                            'timestamp': event.get('timestamp', 0)
+                            'type': 'video_list',
+                            'content': videos,
+                            'role': event.get('author', 'assistant')
                         })
-        st.session_state.messages = messages
+                elif tx := part.get('text'):
+                    messages.append({
+                        'type': 'text',
+                        'content': tx,
+                        'role': event.get('author', 'unknown'),
+                        'timestamp': event.get('timestamp', 0)
+                    })
+    except Exception as e:
+        st.error(f"Error loading session: {str(e)}")
+        return None
+    finally:
+        response.close()
+    return session, messages
+
+def load_session(app_name: str, user_id: str, session_id: str):
+    """Load a specific session"""
+    base = f"/apps/{app_name}/users/{user_id}/sessions/{session_id}"
+    # The artifact listing is independent of the session body, so fetch both at once
+    artifacts = _submit(make_api_request, f"{base}/artifacts")
+    loaded = None
+    try:
+        loaded = _read_session(base)
+    finally:
+        if not loaded or not loaded[0]:
+            # Drop the listing, but never leave the worker running (and calling st.*)
+            # past this script run
+            if not artifacts.cancel():
+                artifacts.result()
+
+    if not loaded or not loaded[0]:
+        return None
+    session, messages = loaded
+    _set_current_session(session)
+    st.session_state.messages = messages
+    st.session_state.artifacts = artifacts.result() or []
     return session
 
+@lru_cache(maxsize=2048)
 def extract_youtube_id(url: str) -> Optional[str]:
     """Extract YouTube video ID from URL"""
     if "youtube.com/watch?v=" in url:
@@ -186,45 +378,146 @@ def extract_youtube_id(url: str) -> Optional[str]:
         return url.split("youtu.be/")[1].split("?")[0]
     return None
 
+@lru_cache(maxsize=2048)
+def _fmt_published(iso: str) -> str:
+    """Format an ISO publish timestamp as YYYY-MM-DD ('' if unparseable)"""
+    try:
+        return datetime.fromisoformat(iso.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+    except Exception:
+        return ''
+
+# 1x1 transparent PNG shown when a thumbnail can't be fetched
+_BLANK_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+# Thumbnails are optional decoration: fail fast rather than block the rerun
+THUMB_TIMEOUT = (0.5, 3)
+
+@st.cache_resource
+def _thumb_session() -> requests.Session:
+    """Shared HTTP session for thumbnail fetches (no retries)"""
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    return http
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _thumb(url: str) -> bytes:
+    """Fetch thumbnail image bytes (cached for an hour; raises so failures aren't kept that long)"""
+    response = _thumb_session().get(url, timeout=THUMB_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def _thumb_bytes(url: str) -> bytes:
+    """Cached thumbnail bytes, or a blank image if the fetch fails (retried after a minute)"""
+    try:
+        return _thumb(url)
+    except requests.exceptions.RequestException:
+        return _BLANK_PNG
+
+def _esc(text: str, limit: Optional[int] = None) -> str:
+    """HTML-escape YouTube snippet text, which arrives already entity-encoded"""
+    # Collapse newlines too: a blank line would end the HTML block in st.markdown
+    return html.escape(' '.join(html.unescape(text)[:limit].split()))
+
+@lru_cache(maxsize=1024)
+def _video_html(title: str, url: str, channel: str, description: str, published_at: str) -> str:
+    """Build the HTML text block (with its separator) for one video; metadata never changes once fetched"""
+    lines = [
+        f"<b><a href='{html.escape(url)}' target='_blank'>{_esc(title)}</a></b>",
+        f"<b>Channel:</b> {_esc(channel)}"
+    ]
+    if description:
+        lines.append(f"<i>{_esc(description, 150)}...</i>")
+    published = _fmt_published(published_at)
+    if published:
+        lines.append(f"<b>Published:</b> {published}")
+    return f"<div>{'<br>'.join(lines)}</div><hr>"
+
+def _render_video_list(videos: List[Dict]):
+    """Render a video list (shared by live events and history replay)"""
+    st.write("Here are the relevant videos:")
+    # Fetch all thumbnails at once so cache misses cost one round trip, not one per video
+    thumbs = {
+        url: _submit(_thumb_bytes, url)
+        for url in {video.get('thumbnail') for video in videos} if url
+    }
+    for video in videos:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            if video.get('thumbnail'):
+                # Bytes go through Streamlit's media endpoint, so the browser can cache them
+                st.image(thumbs[video['thumbnail']].result(), use_container_width=True)
+        with col2:
+            st.markdown(_video_html(
+                video.get('title') or '',
+                video.get('url') or '',
+                video.get('channel') or '',
+                video.get('description') or '',
+                video.get('publishedAt') or ''
+            ), unsafe_allow_html=True)
+
+def _render_function_call(event: Dict):
+    """Render a function call event"""
+    st.markdown(f"🔄 **Function Call:** `{event.get('name', '')}`")
+    if event.get('args'):
+        st.code(_json_pretty(event['args']), language='json')
+
+def _render_videos(event: Dict):
+    """Render a video list event"""
+    _render_video_list(event['content'])
+
+def _render_function_response(event: Dict):
+    """Render a function response event"""
+    st.markdown(f"✅ **Function Response:** `{event.get('name', '')}`")
+    if event.get('content'):
+        st.code(_json_pretty(event['content']), language='json')
+
+def _render_text(event: Dict):
+    """Render a text event (also the fallback for unknown types)"""
+    st.write(event.get('content', ''))
+
+_RENDERERS = {
+    'function_call': _render_function_call,
+    'video_list': _render_videos,
+    'function_response': _render_function_response,
+    'text': _render_text
+}
+
 def display_event(event: Dict):
     """Display a single event in the chat interface"""
     if not event:
         return
         
     with st.chat_message("assistant"):
-        if event['type'] == 'function_call':
-            st.markdown(f"🔄 **Function Call:** `{event.get('name', '')}`")
-            if event.get('args'):
-                st.code(json.dumps(event['args'], indent=2), language='json')
-                
-        elif event['type'] == 'video_list':
-            st.write("Here are the relevant videos:")
-            for video in event['content']:
-                col1, col2 = st.columns([1, 3])
-                with col1:
-                    if video.get('thumbnail'):
-                        st.image(video['thumbnail'], use_container_width=True)
-                with col2:
-                    st.markdown(f"**[{video.get('title', '')}]({video.get('url', '')})**")
-                    st.markdown(f"**Channel:** {video.get('channel', '')}")
-                    if video.get('description'):
-                        st.markdown(f"_{video.get('description')[:150]}..._")
-                    published = video.get('publishedAt')
-                    if published:
-                        try:
-                            dt = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                            st.markdown(f"**Published:** {dt.strftime('%Y-%m-%d')}")
-                        except Exception:
-                            pass
-                st.markdown("---")
-                
-        elif event['type'] == 'function_response':
-            st.markdown(f"✅ **Function Response:** `{event.get('name', '')}`")
-            if event.get('content'):
-                st.code(json.dumps(event['content'], indent=2), language='json')
-                
-        else:  # text type
-            st.write(event.get('content', ''))
+        _RENDERERS.get(event['type'], _render_text)(event)
+
+# History compaction: older messages keep their slot but lose their payload
+KEEP_RECENT_MESSAGES = 20
+ARCHIVED_TEXT_LIMIT = 500
+
+def _compact_messages(msgs: List[Dict], keep: int = KEEP_RECENT_MESSAGES) -> List[Dict]:
+    """Gut messages older than the last `keep` in place so rerenders stay bounded"""
+    for i in range(max(len(msgs) - keep, 0)):
+        msg = msgs[i]
+        if msg.get('_archived'):
+            continue
+        if msg.get('type') == 'video_list':
+            msgs[i] = {
+                'type': 'text',
+                'content': f"[{len(msg.get('content') or [])} videos]",
+                'role': msg.get('role'),
+                '_archived': True
+            }
+        else:
+            content = msg.get('content')
+            if isinstance(content, str) and len(content) > ARCHIVED_TEXT_LIMIT:
+                content = content[:ARCHIVED_TEXT_LIMIT] + "..."
+            msgs[i] = {**msg, 'content': content, '_archived': True}
+    return msgs
 
 # Main UI
 st.title("🤖 Agent API Frontend")
@@ -234,6 +527,7 @@ st.sidebar.header("Configuration")
 
 # Load apps
 if st.sidebar.button("Refresh Apps"):
+    _fetch_apps.clear()
     load_apps()
 
 if not st.session_state.apps:
@@ -255,94 +549,111 @@ if selected_app and user_id:
         if session:
             st.sidebar.success(f"Created session: {session['id']}")
 
-# Main chat interface
-if st.session_state.current_session:
-    session = st.session_state.current_session
-    
-    # Session info
-    st.subheader(f"Session: {session['id']}")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.info(f"App: {session.get('app_name')}")
-    with col2:
-        st.info(f"User: {session.get( 'user_id')}")
-    with col3:
-        last_update = datetime.fromtimestamp(session.get('last_update_time', 0))
-        st.info(f"Last Update: {last_update.strftime('%Y-%m-%d %H:%M')}")
-
-    # Display chat messages
-    chat_container = st.container()
-    with chat_container:
-        for message in st.session_state.messages:
-            role = message.get('role')
-            content = message.get('content')
-            msg_type = message.get('type', 'text')
-            
-            if role == 'user':
-                with st.chat_message("user"):
-                    st.write(content)
-            else:
-                with st.chat_message("assistant"):
-                    if msg_type == 'video_list':
-                        st.write("Here are the relevant videos:")
-                        for video in content:
-                            col1, col2 = st.columns([1, 3])
-                            with col1:
-                                if video.get('thumbnail'):
-                                    st.image(video['thumbnail'], use_container_width=True)
-                            with col2:
-                                # Show clickable title as a YouTube link
-                                st.markdown(f"**[{video.get('title', '')}]({video.get('url', '')})**")
-                                st.markdown(f"**Channel:** {video.get('channel', '')}")
-                                if video.get('description'):
-                                    st.markdown(f"_{video.get('description')[:150]}..._")
-                                # Published date (safe fallback)
-                                published = video.get('publishedAt')
-                                if published:
-                                    try:
-                                        dt = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                                        st.markdown(f"**Published:** {dt.strftime('%Y-%m-%d')}")
-                                    except Exception:
-                                        pass
-                            st.markdown("---")
-                    else:
+# Main chat interface, run as a fragment so chat input reruns only this subtree
+@st.fragment
+def _chat_view():
+    """Render the chat history and message input for the current session"""
+    if st.session_state.current_session:
+        session = st.session_state.current_session
+        
+        # Session info
+        st.subheader(f"Session: {session['id']}")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.info(f"App: {session.get('app_name')}")
+        with col2:
+            st.info(f"User: {session.get( 'user_id')}")
+        with col3:
+            st.info(f"Last Update: {session.get('_last_update_str', '')}")
+
+        # Display chat messages
+        _compact_messages(st.session_state.messages)
+        chat_container = st.container()
+        with chat_container:
+            for message in st.session_state.messages:
+                role = message.get('role')
+                content = message.get('content')
+                msg_type = message.get('type', 'text')
+                
+                if role == 'user':
+                    with st.chat_message("user"):
                         st.write(content)
+                else:
+                    with st.chat_message("assistant"):
+                        if msg_type == 'video_list':
+                            _render_video_list(content)
+                        else:
+                            st.write(content)
 
-    # Message input
-    if prompt := st.chat_input("Type your message here..."):
-        # Add user message to chat
-        st.session_state.messages.append({
-            'role': 'user',
-            'content': prompt,
-            'timestamp': datetime.now().timestamp()
-        })
-        
-        # Display user message immediately
-        with st.chat_message("user"):
-            st.write(prompt)
-        
-        # Send to API and get response
-        with st.spinner("Getting response..."):
-            events = send_message(session['appName'], session['userId'], session['id'], prompt)
+        # Message input
+        if prompt := st.chat_input("Type your message here..."):
+            # Add user message to chat
+            st.session_state.messages.append({
+                'role': 'user',
+                'content': prompt,
+                'timestamp': time.time()
+            })
+            
+            # Display user message immediately
+            with st.chat_message("user"):
+                st.write(prompt)
             
-            if events:
+            # Send to API and get response
+            with st.spinner("Getting response..."):
+                events = send_message(session['appName'], session['userId'], session['id'], prompt)
+                
+                # Render each event as soon as the stream yields it. Partial text is
+                # shown as plain text and only parsed as markdown once complete.
+                st.session_state._streaming_buffer = ''
+                placeholder = None
+                last_flush = 0
                 for event in events:
+                    if isinstance(event, dict) and event.get('partial'):
+                        if placeholder is None:
+                            with st.chat_message("assistant"):
+                                placeholder = st.empty()
+                            # A new text run shows its first delta right away
+                            last_flush = 0
+                        st.session_state._streaming_buffer += event['content']
+                        now = time.monotonic_ns()
+                        if now - last_flush > STREAM_FLUSH_INTERVAL_NS:
+                            placeholder.text(st.session_state._streaming_buffer)
+                            last_flush = now
+                        continue
+
                     if isinstance(event, dict) and 'type' in event:
-                        st.session_state.messages.append({
+                        message = {
                             'role': event.get('author', 'assistant'),
-                            'content': event.get('content'),
-                            'text': event.get('text', ''),
                             'type': event.get('type'),
-                            'timestamp': event.get('timestamp', datetime.now().timestamp())
-                        })
+                            'content': event.get('content')
+                        }
+                        if message['type'] != 'video_list':
+                            message['timestamp'] = event.get('timestamp', time.time())
+                        st.session_state.messages.append(message)
                         
-                        display_event(event)
+                        if placeholder is not None and event['type'] == 'text':
+                            placeholder.markdown(event.get('content', ''))
+                        else:
+                            if placeholder is not None:
+                                # Show any deltas the throttle held back before moving on
+                                placeholder.markdown(st.session_state._streaming_buffer)
+                            display_event(event)
+                        placeholder = None
+                        st.session_state._streaming_buffer = ''
+
+                # The stream ended (or failed) mid text run: flush what was held back
+                if placeholder is not None:
+                    placeholder.markdown(st.session_state._streaming_buffer)
 
-        # Refresh the page to show updated messages
-        st.rerun()
+            # This turn only reran the fragment; the sidebar debug panels (messages,
+            # SSE timing) live outside it, so refresh them with a full run
+            if st.session_state.get('debug_mode'):
+                st.rerun(scope="app")
 
-else:
-    st.info("Please select an app, enter a user ID, and create or load a session to start chatting.")
+    else:
+        st.info("Please select an app, enter a user ID, and create or load a session to start chatting.")
+
+_chat_view()
 
 # Additional features section
 st.sidebar.header("Additional Features")
@@ -352,11 +663,11 @@ if st.session_state.current_session:
     
     # Artifacts section
     if st.sidebar.button("List Artifacts"):
-        artifacts = make_api_request(f"/apps/{session['app_name']}/users/{session['user_id']}/sessions/{session['id']}/artifacts")
-        if artifacts:
-            st.sidebar.write("Artifacts:")
-            for artifact in artifacts:
-                st.sidebar.write(f"- {artifact}")
+        st.session_state.artifacts = make_api_request(f"/apps/{session['app_name']}/users/{session['user_id']}/sessions/{session['id']}/artifacts") or []
+    if st.session_state.artifacts:
+        st.sidebar.write("Artifacts:")
+        for artifact in st.session_state.artifacts:
+            st.sidebar.write(f"- {artifact}")
     
     # Session state display
     if st.sidebar.button("Show Session State"):
@@ -364,7 +675,7 @@ if st.session_state.current_session:
             st.json(session.get('state', {}))
 
 # Debug section
-if st.sidebar.checkbox("Debug Mode"):
+if st.sidebar.checkbox("Debug Mode", key="debug_mode"):
     st.sidebar.header("Debug Info")
     if st.session_state.current_session:
         st.sidebar.json(st.session_state.current_session)
@@ -372,6 +683,23 @@ if st.sidebar.checkbox("Debug Mode"):
     st.sidebar.write("Messages:")
     st.sidebar.json(st.session_state.messages)
 
+    # Inter-event timing of the last streamed reply
+    timings = st.session_state.get('_sse_timings') or []
+    if len(timings) > 1:
+        deltas = np.diff(timings) * 1000
+        # The first delta is request-to-first-event latency, not an inter-event gap
+        gaps = deltas[1:]
+        with st.sidebar.expander("SSE Timing"):
+            st.write(f"Events: {len(deltas)}")
+            st.write(f"First event (from request): {deltas[0]:.0f} ms")
+            if len(gaps):
+                p50, p90, p99 = np.percentile(gaps, [50, 90, 99])
+                stalls = int((gaps > SSE_STALL_MS).sum())
+                st.write(f"Inter-event p50/p90/p99: {p50:.0f} / {p90:.0f} / {p99:.0f} ms")
+                st.write(f"Jitter (stddev): {gaps.std():.0f} ms")
+                if stalls:
+                    st.warning(f"{stalls} stall(s) over {SSE_STALL_MS} ms (max {gaps.max():.0f} ms)")
+
 # Footer
 st.markdown("---")
 st.markdown("*Agent API Frontend - Built with Streamlit*")
\ No newline at end of file